@@ -1,15 +1,17 @@
 import base64
-import json
 import time
-import requests
-from cryptography.hazmat.primitives.asymmetric import ed25519
-from cryptography.hazmat.primitives import serialization
+from typing import TYPE_CHECKING
 from loguru import logger
-from urllib.parse import urlencode
+from bpx.bpx_pub import get_session
+from bpx.clock import ClockSync
+from bpx.codec import dumps, loads, signing_message, header_template, decode_order, decode_orders, Order, to_float
+
+if TYPE_CHECKING:
+    from cryptography.hazmat.primitives.asymmetric import ed25519
 
 class BpxClient:
     url = 'https://api.backpack.exchange/'
-    private_key: ed25519.Ed25519PrivateKey
+    private_key: 'ed25519.Ed25519PrivateKey'
 
     def __init__(self):
         self.debug = False
@@ -20,8 +22,18 @@ class BpxClient:
         self.api_key = ''
         self.api_secret = ''
         self.window = 5000
+        self.clock = None
+
+    # 当前线程的会话，多线程并发调用时互不干扰
+    @property
+    def session(self):
+        return get_session()
 
     def init(self, api_key, api_secret):
+        # 延迟导入，只有签名请求才需要 cryptography，启动时可与网络预热并行
+        from cryptography.hazmat.primitives.asymmetric import ed25519
+        from cryptography.hazmat.primitives import serialization
+
         self.api_key = api_key
         self.api_secret = api_secret
         self.private_key = ed25519.Ed25519PrivateKey.from_private_bytes(
@@ -34,46 +46,56 @@ class BpxClient:
                 format=serialization.PublicFormat.Raw
             )
         ).decode()
+        self.headers = header_template(self.verifying_key_b64)
+
+    # 启用服务器时钟同步，签名使用校正后的时间戳和自适应窗口
+    def enable_clock_sync(self, clock: ClockSync = None):
+        self.clock = (clock or ClockSync.shared()).start()
 
     # capital
     def balances(self):
         while True:
-            res = requests.get(url=f'{self.url}api/v1/capital', proxies=self.proxies,
-                                headers=self.sign('balanceQuery', {}))
+            res = self.session.get(url=f'{self.url}api/v1/capital', proxies=self.proxies,
+                                    headers=self.sign('balanceQuery', {}))
             if str(res.status_code) == "200":
-                return res.json()
+                return loads(res.content)
             else:
                 logger.error(f"查询余额失败，重试...{res.text}")
                 time.sleep(5)
                 continue
         
     def deposits(self):
-        return requests.get(url=f'{self.url}wapi/v1/capital/deposits', proxies=self.proxies,
-                            headers=self.sign('depositQueryAll', {})).json()
+        res = self.session.get(url=f'{self.url}wapi/v1/capital/deposits', proxies=self.proxies,
+                               headers=self.sign('depositQueryAll', {}))
+        return loads(res.content)
 
     def deposit_address(self, chain: str):
         params = {'blockchain': chain}
-        return requests.get(url=f'{self.url}wapi/v1/capital/deposit/address', proxies=self.proxies, params=params,
-                            headers=self.sign('depositAddressQuery', params)).json()
+        res = self.session.get(url=f'{self.url}wapi/v1/capital/deposit/address', proxies=self.proxies, params=params,
+                               headers=self.sign('depositAddressQuery', params))
+        return loads(res.content)
 
     def withdrawals(self, limit: int, offset: int):
         params = {'limit': limit, 'offset': offset}
-        return requests.get(url=f'{self.url}wapi/v1/capital/withdrawals', proxies=self.proxies, params=params,
-                            headers=self.sign('withdrawalQueryAll', params)).json()
+        res = self.session.get(url=f'{self.url}wapi/v1/capital/withdrawals', proxies=self.proxies, params=params,
+                               headers=self.sign('withdrawalQueryAll', params))
+        return loads(res.content)
 
     # history
 
     def order_history_query(self, symbol: str, limit: int, offset: int):
         params = {'symbol': symbol, 'limit': limit, 'offset': offset}
-        return requests.get(url=f'{self.url}wapi/v1/history/orders', proxies=self.proxies, params=params,
-                            headers=self.sign('orderHistoryQueryAll', params)).json()
+        res = self.session.get(url=f'{self.url}wapi/v1/history/orders', proxies=self.proxies, params=params,
+                               headers=self.sign('orderHistoryQueryAll', params))
+        return loads(res.content)
 
     def fill_history_query(self, symbol: str, limit: int, offset: int):
         params = {'limit': limit, 'offset': offset}
         if len(symbol) > 0:
             params['symbol'] = symbol
-        return requests.get(url=f'{self.url}wapi/v1/history/fills', proxies=self.proxies, params=params,
-                            headers=self.sign('fillHistoryQueryAll', params)).json()
+        res = self.session.get(url=f'{self.url}wapi/v1/history/fills', proxies=self.proxies, params=params,
+                               headers=self.sign('fillHistoryQueryAll', params))
+        return loads(res.content)
     
     # order
 
@@ -87,33 +109,33 @@ class BpxClient:
             'quantity': quantity,
             'price': price
         }
+        # 在重试循环外转换，转换失败不会导致重复提交
+        record_price, record_quantity = to_float(price), to_float(quantity)
         retry_limit = 5  # 最大重试次数
         retry_count = 0  # 当前重试计数
         while True:
             try:
-                res = requests.post(url=f'{self.url}api/v1/order', proxies=self.proxies, data=json.dumps(params),
-                                    headers=self.sign('orderExecute', params))
+                res = self.session.post(url=f'{self.url}api/v1/order', proxies=self.proxies, data=dumps(params),
+                                        headers=self.sign('orderExecute', params))
                 if str(res.status_code) == "200":
-                    return res.json()
+                    return decode_order(loads(res.content))
                 elif str(res.status_code) == "202":  # 订单提交了，但是未执行
-                    o = res.json()
-                    return {
-                        'clientId': cid,
-                        'createdAt': None,
-                        'executedQuantity': '0',
-                        'executedQuoteQuantity': '0',
-                        'id': o.get("id"),
-                        'orderType': order_type,
-                        'postOnly': False,
-                        'price': str(price),
-                        'quantity': str(quantity),
-                        'selfTradePrevention': 'RejectTaker',
-                        'side': side,
-                        'status': 'New',
-                        'symbol': symbol,
-                        'timeInForce': time_in_force,
-                        'triggerPrice': None
-                    }
+                    o = loads(res.content)
+                    return Order(
+                        id=o.get("id"),
+                        client_id=cid,
+                        symbol=symbol,
+                        side=side,
+                        order_type=order_type,
+                        time_in_force=time_in_force,
+                        price=record_price,
+                        quantity=record_quantity,
+                        executed_quantity=0.,
+                        executed_quote_quantity=0.,
+                        status='New',
+                        post_only=False,
+                        self_trade_prevention='RejectTaker'
+                    )
                 else:
                     error_message = res.text  # 假设错误信息在响应文本中
                     # 检查是否达到重试次数限制
@@ -124,7 +146,12 @@ class BpxClient:
                     if "Invalid signature" in error_message or "Request has expired" in error_message:
                         retry_count += 1  # 增加重试计数
                         logger.error(f"特定错误，重试次数 {retry_count}/{retry_limit}: {error_message}")
-                        time.sleep(5)
+                        if self.clock and "Request has expired" in error_message:
+                            # 时钟漂移导致过期，重新同步；偏移确有变化才立即重试，否则短暂退避
+                            if not self.clock.sync(reset=True):
+                                time.sleep(1)
+                        else:
+                            time.sleep(5)
                         continue  # 重试
                     else:
                         retry_count += 1  # 增加重试计数
@@ -147,10 +174,10 @@ class BpxClient:
 
         while attempt_count < max_retries:
             try:
-                res = requests.get(url=f'{self.url}api/v1/order', proxies=self.proxies, params=params,
-                                   headers=self.sign('orderQuery', params))
+                res = self.session.get(url=f'{self.url}api/v1/order', proxies=self.proxies, params=params,
+                                       headers=self.sign('orderQuery', params))
                 if res.status_code == 200:
-                    return res.json()  # 成功获取订单
+                    return decode_order(loads(res.content))  # 成功获取订单
                 elif res.status_code == 404:  # 订单不存在
                     return None
                 else:
@@ -183,10 +210,10 @@ class BpxClient:
 
         while attempt_count < max_retries:
             try:
-                res = requests.delete(url=f'{self.url}api/v1/order', proxies=self.proxies, data=json.dumps(params),
-                                      headers=self.sign('orderCancel', params))
+                res = self.session.delete(url=f'{self.url}api/v1/order', proxies=self.proxies, data=dumps(params),
+                                          headers=self.sign('orderCancel', params))
                 if res.status_code == 200:
-                    return res.json()  # 成功取消
+                    return loads(res.content)  # 成功取消
                 elif res.status_code == 202:  # 订单取消了，但是未执行
                     return {'id': order_id, 'status': 'pending'}
                 else:
@@ -211,45 +238,49 @@ class BpxClient:
         if symbol:
             params = {'symbol': symbol}
 
-        return requests.get(url=f'{self.url}api/v1/orders', proxies=self.proxies, params=params,
-                             headers=self.sign('orderQueryAll', params)).json()
+        res = self.session.get(url=f'{self.url}api/v1/orders', proxies=self.proxies, params=params,
+                               headers=self.sign('orderQueryAll', params))
+        if res.status_code != 200:
+            logger.error(f"查询挂单失败, 状态码 {res.status_code}: {res.text}")
+            return []
+        return decode_orders(loads(res.content))
     
     # 取消所有未完成订单
     def cancel_all_open_orders(self, symbol):
         params = {'symbol': symbol}
-        return requests.delete(url=f'{self.url}api/v1/orders', proxies=self.proxies, data=json.dumps(params),
-                             headers=self.sign('orderCancelAll', params)).json()
+        res = self.session.delete(url=f'{self.url}api/v1/orders', proxies=self.proxies, data=dumps(params),
+                                  headers=self.sign('orderCancelAll', params))
+        return loads(res.content)
     
     # 获取历史订单
     def get_history_orders(self, symbol):
         params = {'symbol': symbol}
-        return requests.get(url=f'{self.url}wapi/v1/history/orders', proxies=self.proxies, params=params,
-                             headers=self.sign('orderHistoryQueryAll', params)).json()
+        res = self.session.get(url=f'{self.url}wapi/v1/history/orders', proxies=self.proxies, params=params,
+                               headers=self.sign('orderHistoryQueryAll', params))
+        if res.status_code != 200:
+            logger.error(f"查询历史订单失败, 状态码 {res.status_code}: {res.text}")
+            return []
+        return decode_orders(loads(res.content))
     
     # 获取历史成交订单
     def get_history_filled_orders(self, symbol=None):
         params = {'symbol': symbol}
-        return requests.get(url=f'{self.url}wapi/v1/history/fills', proxies=self.proxies, params=params,
-                             headers=self.sign('fillHistoryQueryAll', params)).json()
+        res = self.session.get(url=f'{self.url}wapi/v1/history/fills', proxies=self.proxies, params=params,
+                               headers=self.sign('fillHistoryQueryAll', params))
+        return loads(res.content)
     
     def sign(self, instruction: str, params: dict = None):
-        timestamp = str(int(time.time() * 1000))
-        window = '5000'
-
-        body = {
-            'instruction': instruction,
-            **dict(sorted((params or {}).items())),
-            'timestamp': timestamp,
-            'window': window,
-        }
-        message = urlencode(body)
-        signature = self.private_key.sign(message.encode())
-        signature_b64 = base64.b64encode(signature).decode()
-
-        return {
-            'X-API-KEY': self.verifying_key_b64,
-            'X-TIMESTAMP': timestamp,
-            'X-WINDOW': window,
-            'Content-Type': 'application/json',
-            'X-SIGNATURE': signature_b64
-        }
+        if self.clock:
+            timestamp = str(self.clock.now_ms())
+            window = str(self.clock.window(self.window))
+        else:
+            timestamp = str(int(time.time() * 1000))
+            window = str(self.window)
+
+        signature = self.private_key.sign(signing_message(instruction, params, timestamp, window))
+
+        headers = self.headers.copy()
+        headers['X-TIMESTAMP'] = timestamp
+        headers['X-WINDOW'] = window
+        headers['X-SIGNATURE'] = base64.b64encode(signature).decode()
+        return headers
@@ -1,28 +1,41 @@
 import requests
+import threading
 import time
 from loguru import logger
-import datetime
+from bpx.codec import loads, decode_depth
 
 BP_BASE_URL = ' https://api.backpack.exchange/'
 
+# 每个线程一个会话：requests.Session 不保证线程安全，
+# 同一线程内的公共和签名接口复用已建立的 TLS 连接
+_local = threading.local()
+
+
+def get_session():
+    session = getattr(_local, 'session', None)
+    if session is None:
+        session = _local.session = requests.Session()
+    return session
+
+
 # Markets
 def assets():
-    return requests.get(url=f'{BP_BASE_URL}api/v1/assets').json()
+    return get_session().get(url=f'{BP_BASE_URL}api/v1/assets').json()
 
 
 def markets():
-    return requests.get(url=f'{BP_BASE_URL}api/v1/markets').json()
+    return get_session().get(url=f'{BP_BASE_URL}api/v1/markets').json()
 
 
 def ticker(symbol: str):
-    return requests.get(url=f'{BP_BASE_URL}api/v1/ticker?symbol={symbol}').json()
+    return get_session().get(url=f'{BP_BASE_URL}api/v1/ticker?symbol={symbol}').json()
 
 
 def depth(symbol: str):
     while True:
-        res = requests.get(url=f'{BP_BASE_URL}api/v1/depth?symbol={symbol}')
+        res = get_session().get(url=f'{BP_BASE_URL}api/v1/depth?symbol={symbol}')
         if str(res.status_code) == "200":
-            return res.json()
+            return decode_depth(loads(res.content))
         else:
             logger.error(f"获取深度数据失败: {res.text}, 重试")
             time.sleep(2)
@@ -38,7 +51,7 @@ def klines(symbol: str, interval: str, start_time: int = 0, end_time: int = 0):
     if end_time > 0:
         params['endTime'] = end_time
 
-    response = requests.get(url, params=params)
+    response = get_session().get(url, params=params)
     if response.status_code != 200:
         print(f'Error: {response.status_code}')
         print(f'Response: {response.text}')
@@ -48,27 +61,29 @@ def klines(symbol: str, interval: str, start_time: int = 0, end_time: int = 0):
 
 # System
 def status():
-    return requests.get(url=f'{BP_BASE_URL}api/v1/status').json()
+    return get_session().get(url=f'{BP_BASE_URL}api/v1/status').json()
 
 
 def ping():
-    return requests.get(url=f'{BP_BASE_URL}api/v1/ping').text
+    return get_session().get(url=f'{BP_BASE_URL}api/v1/ping').text
 
 
 def time():
-    return requests.get(url=f'{BP_BASE_URL}api/v1/time').text
+    return get_session().get(url=f'{BP_BASE_URL}api/v1/time').text
 
 
 # Trades
 def recent_trades(symbol: str, limit: int = 100):
-    return requests.get(url=f'{BP_BASE_URL}api/v1/trades?symbol={symbol}&limit={limit}').json()
+    return get_session().get(url=f'{BP_BASE_URL}api/v1/trades?symbol={symbol}&limit={limit}').json()
 
 
 def history_trades(symbol: str, limit: int = 100, offset: int = 0):
-    return requests.get(url=f'{BP_BASE_URL}api/v1/trades/history?symbol={symbol}&limit={limit}&offset={offset}').json()
+    return get_session().get(url=f'{BP_BASE_URL}api/v1/trades/history?symbol={symbol}&limit={limit}&offset={offset}').json()
 
 
 if __name__ == '__main__':
+    import datetime
+
     # print(Assets())
     logger.info(markets())
     # print(Ticker('SOL_USDC'))
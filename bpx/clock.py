@@ -0,0 +1,112 @@
+import threading
+import time
+from collections import deque
+from loguru import logger
+from bpx import bpx_pub
+
+MAX_WINDOW = 60000  # 交易所允许的最大签名窗口（毫秒）
+
+
+class ClockSync:
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, interval=30, samples=16, burst=4, window_multiplier=4, debounce=1):
+        self.interval = interval  # 后台同步间隔（秒）
+        self.debounce = debounce  # 距上次同步不足该秒数时，强制同步直接复用上次结果
+        self.burst = burst  # 每轮同步采样次数
+        self.window_multiplier = window_multiplier  # 窗口 = 倍数 * p95 RTT + 偏移误差
+        self.samples = deque(maxlen=samples)  # 估计偏移用的新鲜样本 (offset_ms, rtt_ms, 采样时的 monotonic 时间)
+        self.rtts = deque(maxlen=samples)  # 计算签名窗口用的 RTT 历史，不按年龄淘汰
+        self.offset = 0.  # 服务器时间 - 本地时间（毫秒）
+        self.error = 0.  # 偏移估计误差上界（毫秒），即最优样本 RTT 的一半
+        self.lock = threading.Lock()
+        self.sync_lock = threading.Lock()  # 串行化同步，并发的强制同步不会互相清空样本
+        self.synced_at = None  # 上次同步完成的 monotonic 时间
+        self.changed = False  # 上次同步的结果
+        self.thread = None
+
+    # 进程内共享的同步器，多个 BpxClient 共用一个后台线程
+    @classmethod
+    def shared(cls):
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def start(self):
+        with self.lock:
+            if self.thread is not None:
+                return self
+            self.thread = threading.Thread(target=self._run, name='bpx-clock-sync', daemon=True)
+        self.sync(1)  # 启动时只取一个样本，完整采样交给后台线程，避免阻塞首单
+        self.thread.start()
+        return self
+
+    def _run(self):
+        while True:
+            self.sync()
+            time.sleep(self.interval)
+
+    # NTP 式采样：t0 发送，t3 接收，服务器时间视为往返中点
+    def sample(self):
+        t0 = time.time() * 1000
+        text = bpx_pub.time()
+        t3 = time.time() * 1000
+        server = float(str(text).strip().strip('"'))
+        rtt = t3 - t0
+        return server - (t0 + t3) / 2, rtt
+
+    # reset=True 时丢弃偏移样本（RTT 历史保留），用于怀疑本地时钟跳变后的强制同步；
+    # 多个下单线程同时触发时，只有第一个真正同步，其余复用它的结果
+    # 返回偏移是否发生了超出估计误差的变化
+    def sync(self, burst=None, reset=False):
+        with self.sync_lock:
+            if reset and self.synced_at is not None and time.monotonic() - self.synced_at < self.debounce:
+                return self.changed
+            self.changed = self._sync(burst, reset)
+            self.synced_at = time.monotonic()
+            return self.changed
+
+    def _sync(self, burst, reset):
+        if reset:
+            with self.lock:
+                self.samples.clear()
+        for _ in range(burst or self.burst):
+            try:
+                offset, rtt = self.sample()
+            except Exception as e:
+                logger.error(f"同步服务器时间失败: {e}")
+                continue
+            with self.lock:
+                self.samples.append((offset, rtt, time.monotonic()))
+                self.rtts.append(rtt)
+        with self.lock:
+            # 超过一个同步间隔的样本可能来自跳变前的时钟，不再参与估计；
+            # 样本年龄用 monotonic 计算，不受本地时钟跳变影响
+            expired = time.monotonic() - self.interval
+            while self.samples and self.samples[0][2] < expired:
+                self.samples.popleft()
+            if not self.samples:
+                return False
+            # RTT 最小的样本受排队延迟影响最小，偏移估计最可靠
+            offset, rtt, _ = min(self.samples, key=lambda s: s[1])
+            changed = abs(offset - self.offset) > rtt / 2
+            self.offset = offset
+            self.error = rtt / 2
+        logger.debug(f"服务器时钟偏移 {self.offset:.1f}ms，误差 ±{self.error:.1f}ms，签名窗口 {self.window()}ms")
+        return changed
+
+    def now_ms(self):
+        return int(time.time() * 1000 + self.offset)
+
+    # 根据 RTT 分布计算签名窗口，不小于调用方配置的窗口
+    def window(self, minimum=5000):
+        with self.lock:
+            rtts = sorted(self.rtts)
+            error = self.error
+        if not rtts:
+            return int(minimum)
+        p95 = rtts[min(len(rtts) - 1, int(len(rtts) * 0.95))]
+        adaptive = int(self.window_multiplier * p95 + error)
+        return min(MAX_WINDOW, max(int(minimum), adaptive))
@@ -0,0 +1,177 @@
+import json
+from urllib.parse import quote_plus, urlencode
+
+# 可选的快速 JSON 后端，未安装 orjson 时回退到标准库
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    dumps = orjson.dumps
+    loads = orjson.loads
+else:
+    _encoder = json.JSONEncoder(separators=(',', ':'))
+
+    def dumps(obj) -> bytes:
+        return _encoder.encode(obj).encode()
+
+    loads = json.loads
+
+
+# 签名消息: instruction=...&<按键排序的参数>&timestamp=...&window=...
+# instruction 前缀按指令缓存，只在第一次使用时编码
+_prefixes = {}
+
+
+def signing_prefix(instruction: str) -> str:
+    prefix = _prefixes.get(instruction)
+    if prefix is None:
+        prefix = _prefixes[instruction] = 'instruction=' + quote_plus(instruction)
+    return prefix
+
+
+def signing_message(instruction: str, params: dict, timestamp: str, window: str) -> bytes:
+    message = signing_prefix(instruction)
+    if params:
+        message = f'{message}&{urlencode(sorted(params.items()))}'
+    return f'{message}&timestamp={timestamp}&window={window}'.encode()
+
+
+def header_template(api_key: str) -> dict:
+    return {
+        'X-API-KEY': api_key,
+        'X-TIMESTAMP': '',
+        'X-WINDOW': '',
+        'Content-Type': 'application/json',
+        'X-SIGNATURE': ''
+    }
+
+
+# 接口数值字段（字符串）转 float，None 保持为 None
+def to_float(value):
+    return None if value is None else float(value)
+
+
+# 紧凑记录，数值字段已转为 float；保留按接口字段名的 [] / get 访问以兼容旧代码
+class _Record:
+    __slots__ = ()
+    _keys = {}
+
+    def __getitem__(self, key):
+        return getattr(self, self._keys[key])
+
+    def get(self, key, default=None):
+        name = self._keys.get(key)
+        return default if name is None else getattr(self, name)
+
+    def __repr__(self):
+        fields = ', '.join(f'{name}={getattr(self, name)!r}' for name in self.__slots__)
+        return f'{type(self).__name__}({fields})'
+
+
+class Order(_Record):
+    __slots__ = ('id', 'client_id', 'symbol', 'side', 'order_type', 'time_in_force', 'price', 'quantity',
+                 'executed_quantity', 'executed_quote_quantity', 'trigger_price', 'status', 'created_at',
+                 'post_only', 'self_trade_prevention')
+    _keys = {
+        'id': 'id',
+        'clientId': 'client_id',
+        'symbol': 'symbol',
+        'side': 'side',
+        'orderType': 'order_type',
+        'timeInForce': 'time_in_force',
+        'price': 'price',
+        'quantity': 'quantity',
+        'executedQuantity': 'executed_quantity',
+        'executedQuoteQuantity': 'executed_quote_quantity',
+        'triggerPrice': 'trigger_price',
+        'status': 'status',
+        'createdAt': 'created_at',
+        'postOnly': 'post_only',
+        'selfTradePrevention': 'self_trade_prevention',
+    }
+
+    id: str
+    client_id: int
+    symbol: str
+    side: str
+    order_type: str
+    time_in_force: str
+    price: float
+    quantity: float
+    executed_quantity: float
+    executed_quote_quantity: float
+    trigger_price: float
+    status: str
+    created_at: int
+    post_only: bool
+    self_trade_prevention: str
+
+    def __init__(self, id=None, client_id=None, symbol=None, side=None, order_type=None, time_in_force=None,
+                 price=None, quantity=None, executed_quantity=None, executed_quote_quantity=None, trigger_price=None,
+                 status=None, created_at=None, post_only=None, self_trade_prevention=None):
+        self.id = id
+        self.client_id = client_id
+        self.symbol = symbol
+        self.side = side
+        self.order_type = order_type
+        self.time_in_force = time_in_force
+        self.price = price
+        self.quantity = quantity
+        self.executed_quantity = executed_quantity
+        self.executed_quote_quantity = executed_quote_quantity
+        self.trigger_price = trigger_price
+        self.status = status
+        self.created_at = created_at
+        self.post_only = post_only
+        self.self_trade_prevention = self_trade_prevention
+
+
+class Depth(_Record):
+    __slots__ = ('bids', 'asks', 'last_update_id')
+    _keys = {'bids': 'bids', 'asks': 'asks', 'lastUpdateId': 'last_update_id'}
+
+    bids: list  # [(price, quantity)]，价格升序
+    asks: list  # [(price, quantity)]，价格升序
+    last_update_id: str
+
+    def __init__(self, bids, asks, last_update_id=None):
+        self.bids = bids
+        self.asks = asks
+        self.last_update_id = last_update_id
+
+
+def decode_order(o: dict):
+    if o is None:
+        return None
+    return Order(
+        id=o.get('id'),
+        client_id=o.get('clientId'),
+        symbol=o.get('symbol'),
+        side=o.get('side'),
+        order_type=o.get('orderType'),
+        time_in_force=o.get('timeInForce'),
+        price=to_float(o.get('price')),
+        quantity=to_float(o.get('quantity')),
+        executed_quantity=to_float(o.get('executedQuantity')),
+        executed_quote_quantity=to_float(o.get('executedQuoteQuantity')),
+        trigger_price=to_float(o.get('triggerPrice')),
+        status=o.get('status'),
+        created_at=o.get('createdAt'),
+        post_only=o.get('postOnly'),
+        self_trade_prevention=o.get('selfTradePrevention'),
+    )
+
+
+def decode_orders(orders: list):
+    return [decode_order(o) for o in orders]
+
+
+def decode_depth(d: dict):
+    return Depth(
+        bids=[(float(p), float(q)) for p, q in d.get('bids', ())],
+        asks=[(float(p), float(q)) for p, q in d.get('asks', ())],
+        last_update_id=d.get('lastUpdateId'),
+    )
+
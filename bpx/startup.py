@@ -0,0 +1,123 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+# requests（经 bpx_pub）和 loguru 有意保持立即导入：首个网络请求和日志马上就要用到，
+# 延迟导入只会把耗时挪到关键路径上。只有签名才需要的 cryptography 在 BpxClient.init 中延迟导入。
+# 计时起点取自进程启动时间，这些导入耗时同样计入首单指标
+from loguru import logger
+from bpx import bpx_pub
+
+
+# Linux 下从 /proc 读取进程真实启动时间，包含解释器启动和 import 耗时
+def _process_start():
+    try:
+        with open('/proc/self/stat') as f:
+            start_ticks = int(f.read().rsplit(')', 1)[1].split()[19])
+        with open('/proc/uptime') as f:
+            uptime = float(f.read().split()[0])
+        return time.time() - uptime + start_ticks / os.sysconf('SC_CLK_TCK')
+    except (OSError, ValueError, IndexError, AttributeError):
+        return time.time()
+
+
+# tickSize/stepSize 换算为小数位数，如 "0.01" -> 2；缺失时返回 None
+def _decimals(step):
+    if step is None:
+        return None
+    step = f'{float(step):f}'.rstrip('0')
+    return len(step.split('.')[1]) if '.' in step else 0
+
+
+class WarmUp:
+    def __init__(self, quote, balances, open_orders, price_precision=None, quantity_precision=None):
+        self.quote = quote  # 行情（ticker 或 depth）
+        self.balances = balances
+        self.open_orders = open_orders
+        self.price_precision = price_precision  # 来自市场信息，获取失败时为 None
+        self.quantity_precision = quantity_precision
+
+
+class Startup:
+    def __init__(self, workers=8):
+        self.started_at = _process_start()
+        self.marks = {}  # 阶段名 -> 距进程启动的毫秒数
+        self.first_order_at = None
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='bpx-startup')
+        self.markets = None
+
+    def elapsed_ms(self, at=None):
+        return ((at or time.time()) - self.started_at) * 1000
+
+    def mark(self, name):
+        self.marks[name] = round(self.elapsed_ms())
+        logger.debug(f"启动阶段 {name}: {self.marks[name]}ms")
+
+    def submit(self, fn, *args, **kwargs):
+        return self.executor.submit(fn, *args, **kwargs)
+
+    # workers 限制同时进行的任务数，避免突发大量下单/撤单请求；
+    # 滑动窗口：任一任务完成即提交下一个，不会被同批最慢的任务拖住
+    def map(self, fn, items, workers=None):
+        if not workers:
+            return list(self.executor.map(fn, items))
+        slots = threading.BoundedSemaphore(workers)
+
+        def run(item):
+            try:
+                return fn(item)
+            finally:
+                slots.release()
+
+        futures = []
+        for item in items:
+            slots.acquire()
+            futures.append(self.executor.submit(run, item))
+        return [f.result() for f in futures]
+
+    # 并行预热：密钥加载、时钟同步、行情和市场信息同时进行，
+    # 密钥就绪后再并行查询余额和挂单。行情在调用线程获取，
+    # 顺便预热该线程的会话，首单通常由它发出
+    def warm_up(self, client, api_key, api_secret, symbol, quote=bpx_pub.depth):
+        self.mark('warm_up')
+        keys = self.submit(client.init, api_key, api_secret)
+        clock = self.submit(client.enable_clock_sync)
+        if self.markets is None:
+            self.markets = self.submit(bpx_pub.markets)  # 每个进程只请求一次，与行情并行
+        quote_result = quote(symbol)
+
+        keys.result()
+        clock.result()
+        self.mark('keys_loaded')
+        balances = self.submit(client.balances)
+        open_orders = self.submit(client.get_all_open_orders, symbol)
+
+        filters = (self.market(symbol) or {}).get('filters') or {}
+        warm = WarmUp(quote_result, balances.result(), open_orders.result(),
+                      price_precision=_decimals((filters.get('price') or {}).get('tickSize')),
+                      quantity_precision=_decimals((filters.get('quantity') or {}).get('stepSize')))
+        self.mark('warm_up_done')
+        return warm
+
+    def market(self, symbol):
+        if self.markets is None:
+            self.markets = self.submit(bpx_pub.markets)
+        try:
+            return next((m for m in self.markets.result() if m.get('symbol') == symbol), None)
+        except Exception as e:
+            logger.error(f"获取市场信息失败: {e}")
+            self.markets = None  # 下次预热时重新请求
+            return None
+
+    # 记录 "进程启动 → 首单确认" 耗时，每个进程只记录一次
+    def order_acknowledged(self):
+        with self.lock:
+            if self.first_order_at is not None:
+                return
+            self.first_order_at = time.time()
+        self.marks['first_order'] = round(self.elapsed_ms(self.first_order_at))
+        logger.info(f"首单确认耗时 {self.marks['first_order']}ms（自进程启动），各阶段: {self.marks}")
+
+
+startup = Startup()
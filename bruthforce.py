@@ -1,3 +1,4 @@
+from bpx.startup import startup  # 最先导入，尽早创建预热线程池
 from bpx.bpx import *
 from bpx.bpx_pub import *
 import random
@@ -5,6 +6,7 @@ import string
 from loguru import logger
 from requests.exceptions import ConnectionError
 from urllib3.exceptions import ProtocolError
+import time
 
 class SpotGrid:
     def __init__(self):
@@ -20,52 +22,65 @@ class SpotGrid:
         self.quantity_precision = 2  # 下单量精度，下单量最多几位小数
 
         self.depth = None  # 深度数据
+        self.balance = None  # 预热得到的余额，仅供首次下单使用
+        self.parallel_orders = 4  # 启动时并发撤单数
         self.strategy_prefix = "1"  # 策略唯一编号，取值保守的话可以1~40，保证每个策略这个不同就行，这样可以运行多个网格
 
         self.buy_order = None
         self.sell_order = None
         self.bpx = BpxClient()
-        self.bpx.init('api_key', 'api_secret')
+        self.api_key, self.api_secret = 'api_key', 'api_secret'  # 密钥在 warm_up 中与行情并行加载
 
     # 生成client_id
     def get_client_id(self, size=6, chars=string.digits):
         id = ''.join(random.choice(chars) for _ in range(size))
         return int(f"{self.strategy_prefix}{id}")
 
-    def get_open_orders(self):
-        open_orders = self.bpx.get_all_open_orders(symbol=self.symbol)
+    def get_open_orders(self, open_orders=None):
+        if open_orders is None:
+            open_orders = self.bpx.get_all_open_orders(symbol=self.symbol)
         relevant_orders = []  # 存储与策略前缀匹配的订单
         for o in open_orders:
             # Assuming orders without a clientId are still relevant
-            if o.get("clientId") is None or str(o.get("clientId", "")).startswith(self.strategy_prefix):
+            if o.client_id is None or str(o.client_id).startswith(self.strategy_prefix):
                 relevant_orders.append(o)  # 添加到列表中
-                if o.get("side") == "Bid":
+                if o.side == "Bid":
                     self.buy_order = o
                     logger.info(f"已存在买单 {self.buy_order}")
-                elif o.get("side") == "Ask":
+                elif o.side == "Ask":
                     self.sell_order = o
                     logger.info(f"已存在卖单 {self.sell_order}")
         return relevant_orders  # 返回与策略前缀匹配的所有订单
 
-    def get_bid_ask_price(self):
-        self.depth = depth(self.symbol)
+    def get_bid_ask_price(self, quote=None):
+        self.depth = quote or depth(self.symbol)
         if self.depth:
-            return float(self.depth['bids'][-1][0]), float(self.depth['asks'][0][0])
+            return self.depth.bids[-1][0], self.depth.asks[0][0]
         else:
             return None, None
 
     def round_to(self, number, precision):
         return float(f'{number:.{precision}f}')
 
+    # 使用交易所市场信息中的精度，获取失败时保留默认配置
+    def apply_market_precision(self, warm):
+        if warm.price_precision is not None:
+            self.price_precision = warm.price_precision
+        if warm.quantity_precision is not None:
+            self.quantity_precision = warm.quantity_precision
+        logger.info(f"价格精度 {self.price_precision}，下单量精度 {self.quantity_precision}")
+
     def getOrderInfo(self, orderId):
         orders = self.bpx.get_history_orders(self.symbol)  # 获取历史订单
         for o in orders:
-            if o.get("id") == orderId:
+            if o.id == orderId:
                 return o
         return None
 
     def get_balance(self):
-        b = self.bpx.balances()
+        return self.parse_balance(self.bpx.balances())
+
+    def parse_balance(self, b):
         if b:
             s = self.symbol.split("_")
             b1 = float(b.get(s[0], {}).get("available", 0.))
@@ -76,18 +91,20 @@ class SpotGrid:
 
     # 创建订单
     def create_order(self, symbol, side, orderType, timeInForce, quantity, price):
-        # 获取当前余额
-        b1, b2 = self.get_balance()  # 假设b1为持仓量，b2为资金量
-
         if price < self.min_price or price > self.max_price:
             logger.info(f"当前价格{price}不在网格下单范围内({self.min_price} ~ {self.max_price})，不下单")
             return None
-        bid_price, ask_price = self.get_bid_ask_price()
+
+        # 获取当前余额，预热的余额只用一次，下单后余额会变化
+        b1, b2 = self.balance or self.get_balance()  # 假设b1为持仓量，b2为资金量
+        self.balance = None
+
         # 检查是否为卖单且余额不足
         if side == "Ask" and b1 < quantity:
             logger.error("卖单余额不足，尝试反向买入一半资产...")
             # 改为买入操作
             side = "Bid"
+            bid_price, ask_price = self.get_bid_ask_price()
             price = self.round_to(ask_price * (1 + float(self.gap_percent)), self.price_precision)
             quantity = b2 / (2 * price)
             quantity = self.round_to(float(quantity), self.quantity_precision)
@@ -97,6 +114,7 @@ class SpotGrid:
             logger.error("买单余额不足，尝试反向卖出一半资产...")
             # 改为卖出操作
             side = "Ask"
+            bid_price, ask_price = self.get_bid_ask_price()
             price = self.round_to(bid_price * (1 - float(self.gap_percent)), self.price_precision)
             quantity = b1 / 2
             quantity = self.round_to(float(quantity), self.quantity_precision)
@@ -104,6 +122,8 @@ class SpotGrid:
         # 执行订单
         order_result = self.bpx.exe_order(cid=self.get_client_id(), symbol=symbol, side=side, order_type=orderType,
                                           time_in_force=timeInForce, quantity=quantity, price=price)
+        if order_result:
+            startup.order_acknowledged()
         # if order_result:
         #     logger.info(f"成功创建订单: {order_result}")
         # else:
@@ -144,9 +164,9 @@ class SpotGrid:
     def check_order_status(self):
         # 检查买单状态
         if self.buy_order:
-            check_order = self.bpx.get_open_order(self.symbol, self.buy_order.get("id"))
+            check_order = self.bpx.get_open_order(self.symbol, self.buy_order.id)
             if not check_order:  # 订单可能已成交或被取消
-                check_order = self.getOrderInfo(self.buy_order.get("id"))
+                check_order = self.getOrderInfo(self.buy_order.id)
             if check_order and check_order.get('status') == "Filled":
                 logger.info(f"买单成交: {check_order}")
                 self.buy_order = None
@@ -154,25 +174,28 @@ class SpotGrid:
 
         # 检查卖单状态
         if self.sell_order:
-            check_order = self.bpx.get_open_order(self.symbol, self.sell_order.get("id"))
+            check_order = self.bpx.get_open_order(self.symbol, self.sell_order.id)
             if not check_order:  # 订单可能已成交或被取消
-                check_order = self.getOrderInfo(self.sell_order.get("id"))
+                check_order = self.getOrderInfo(self.sell_order.id)
             if check_order and check_order.get('status') == "Filled":
                 logger.info(f"卖单成交: {check_order}")
                 self.sell_order = None
                 # 可在此处根据成交信息创建新的买单
 
-    def cancel_all_orders(self):
-        open_orders = self.get_open_orders()  # 假设这个方法返回所有开放的订单列表
-        for order in open_orders:
-            try:
-                cancel_result = self.bpx.cancel_order(self.symbol, order.get("id"))
-                if cancel_result:
-                    logger.info(f"已撤销订单: {order.get('id')}")
-                else:
-                    logger.warning(f"撤销订单失败: {order.get('id')}")
-            except Exception as e:
-                logger.error(f"撤销订单时发生异常: {e}")
+    def cancel_all_orders(self, open_orders=None):
+        open_orders = self.get_open_orders(open_orders)  # 假设这个方法返回所有开放的订单列表
+        startup.map(self.cancel_order, open_orders, workers=self.parallel_orders)
+        return open_orders
+
+    def cancel_order(self, order):
+        try:
+            cancel_result = self.bpx.cancel_order(self.symbol, order.id)
+            if cancel_result:
+                logger.info(f"已撤销订单: {order.id}")
+            else:
+                logger.warning(f"撤销订单失败: {order.id}")
+        except Exception as e:
+            logger.error(f"撤销订单时发生异常: {e}")
 
 
     # def get_open_orders(self):
@@ -190,9 +213,16 @@ class SpotGrid:
         max_runtime = 15  # 最大运行时间，600秒等于10分钟
         retry_delay = 10  # 遇到连接异常时的重试延迟（秒）
         # self.get_open_orders()  # 如果程序挂了，重启恢复
+        # 并行获取系统状态、行情、余额、挂单和市场精度，首轮循环直接使用预热结果
+        system_status = startup.submit(status)
+        warm = startup.warm_up(self.bpx, self.api_key, self.api_secret, self.symbol, quote=depth)
+        self.apply_market_precision(warm)
         quantity = self.round_to(float(self.quantity), self.quantity_precision)
         logger.info(f"订单下单量调整为{quantity}")
-        self.cancel_all_orders()  # 检查并撤销所有现有的买卖订单
+        quote = warm.quote
+        if not self.cancel_all_orders(warm.open_orders):  # 检查并撤销所有现有的买卖订单
+            # 没有撤单时余额未变，首次下单可直接使用预热的余额
+            self.balance = self.parse_balance(warm.balances)
 
         while True:
             current_time = time.time()
@@ -200,12 +230,15 @@ class SpotGrid:
                 logger.info(f"达到最大运行时间，重置程序以重新运行。")
                 break  # 退出循环，而不是调用self.start_grid()
             try:
-                s = status()  # 获取系统状态
+                s = system_status.result() if system_status else status()  # 获取系统状态
+                system_status = None
                 if s and s.get('status') != "Ok":
                     logger.info("系统维护中...")
+                    quote = None
                     time.sleep(10)
                     continue
-                bid_price, ask_price = self.get_bid_ask_price()
+                bid_price, ask_price = self.get_bid_ask_price(quote)
+                quote = None
 
                 # 检查买单和卖单，尝试创建订单
                 self.check_and_create_orders(bid_price, ask_price, quantity)
@@ -1,3 +1,4 @@
+from bpx.startup import startup  # 最先导入，尽早创建预热线程池
 from bpx.bpx import *
 from bpx.bpx_pub import *
 import random
@@ -19,9 +20,10 @@ class SpotGrid:
         self.price_precision = 2
         self.quantity_precision = 2
         self.strategy_prefix = "1"
+        self.parallel_orders = 4  # 启动时并发下单/撤单数，运行中调整网格时逐个处理
         self.grid_orders = {}
         self.bpx = BpxClient()
-        self.bpx.init('api_key', 'api_secret')
+        self.api_key, self.api_secret = 'api_key', 'api_secret'  # 密钥在 warm_up 中与行情并行加载
         self.total_profit = 0
 
     def get_client_id(self, size=6, chars=string.digits):
@@ -31,6 +33,14 @@ class SpotGrid:
     def round_to(self, number, precision):
         return float(f'{number:.{precision}f}')
 
+    # 使用交易所市场信息中的精度，获取失败时保留默认配置
+    def apply_market_precision(self, warm):
+        if warm.price_precision is not None:
+            self.price_precision = warm.price_precision
+        if warm.quantity_precision is not None:
+            self.quantity_precision = warm.quantity_precision
+        logger.info(f"价格精度 {self.price_precision}，下单量精度 {self.quantity_precision}")
+
     def get_balance(self):
         b = self.bpx.balances()
         if b:
@@ -38,12 +48,12 @@ class SpotGrid:
             return float(b.get(s[0], {}).get("available", 0.)), float(b.get(s[1], {}).get("available", 0.))
         return None, None
 
-    def get_current_price(self):
-        ticker = self.bpx.ticker(self.symbol)
-        return float(ticker['lastPrice']) if ticker else None
+    def get_current_price(self, quote=None):
+        quote = quote or ticker(self.symbol)
+        return float(quote['lastPrice']) if quote else None
 
-    def create_grid(self):
-        current_price = self.get_current_price()
+    def create_grid(self, current_price=None, parallel=False):
+        current_price = current_price or self.get_current_price()
         if not current_price:
             logger.error("Failed to get current price")
             return
@@ -52,17 +62,21 @@ class SpotGrid:
         upper_price = current_price * (1 + self.grid_spread * self.grid_levels / 2)
         lower_price = current_price / (1 + self.grid_spread * self.grid_levels / 2)
 
-        for i in range(self.grid_levels):
-            grid_price = self.round_to(lower_price * (1 + self.grid_spread) ** i, self.price_precision)
-            if grid_price < current_price:
-                self.place_grid_order("Bid", grid_price)
-            elif grid_price > current_price:
-                self.place_grid_order("Ask", grid_price)
+        grid_prices = [self.round_to(lower_price * (1 + self.grid_spread) ** i, self.price_precision)
+                       for i in range(self.grid_levels)]
+        # 离当前价最近的档位先提交，启动时有限并发下单
+        grid_prices = sorted((p for p in grid_prices if p != current_price), key=lambda p: abs(p - current_price))
+        place = lambda p: self.place_grid_order("Bid" if p < current_price else "Ask", p)
+        if parallel:
+            startup.map(place, grid_prices, workers=self.parallel_orders)
+        else:
+            for grid_price in grid_prices:
+                place(grid_price)
 
     def place_grid_order(self, side, price):
         order = self.create_order(self.symbol, side, "Limit", "GTC", self.quantity, price)
         if order:
-            self.grid_orders[order['id']] = order
+            self.grid_orders[order.id] = order
             logger.info(f"Placed {side} order at {price}")
 
     def create_order(self, symbol, side, order_type, time_in_force, quantity, price):
@@ -76,6 +90,8 @@ class SpotGrid:
                 quantity=self.round_to(quantity, self.quantity_precision),
                 price=self.round_to(price, self.price_precision)
             )
+            if order:
+                startup.order_acknowledged()
             return order
         except Exception as e:
             logger.error(f"Error creating order: {e}")
@@ -85,20 +101,20 @@ class SpotGrid:
         for order_id, order in list(self.grid_orders.items()):
             status = self.bpx.get_open_order(self.symbol, order_id)
             if not status:
-                filled_price = float(order['price'])
+                filled_price = order.price
                 logger.info(f"Order filled: {order}")
                 del self.grid_orders[order_id]
 
                 # Calculate profit/loss
-                if order['side'] == "Ask":
-                    profit = (filled_price - float(order['price'])) * float(order['quantity'])
+                if order.side == "Ask":
+                    profit = (filled_price - order.price) * order.quantity
                 else:
-                    profit = (float(order['price']) - filled_price) * float(order['quantity'])
+                    profit = (order.price - filled_price) * order.quantity
                 self.total_profit += profit
                 logger.info(f"Profit from this trade: {profit}, Total profit: {self.total_profit}")
 
                 # Place a new opposite order
-                new_side = "Ask" if order['side'] == "Bid" else "Bid"
+                new_side = "Ask" if order.side == "Bid" else "Bid"
                 new_price = self.round_to(filled_price * (1 + self.grid_spread if new_side == "Ask" else 1 - self.grid_spread), self.price_precision)
                 self.place_grid_order(new_side, new_price)
 
@@ -107,8 +123,8 @@ class SpotGrid:
         if not current_price:
             return
 
-        lower_bound = min(float(order['price']) for order in self.grid_orders.values())
-        upper_bound = max(float(order['price']) for order in self.grid_orders.values())
+        lower_bound = min(order.price for order in self.grid_orders.values())
+        upper_bound = max(order.price for order in self.grid_orders.values())
 
         if current_price < lower_bound * 1.1 or current_price > upper_bound * 0.9:
             logger.info("Price moved significantly. Recreating grid.")
@@ -117,8 +133,10 @@ class SpotGrid:
 
     def run_grid_strategy(self):
         logger.info("Starting grid strategy")
-        self.cancel_all_orders()
-        self.create_grid()
+        warm = startup.warm_up(self.bpx, self.api_key, self.api_secret, self.symbol, quote=ticker)
+        self.apply_market_precision(warm)
+        self.cancel_all_orders(warm.open_orders, parallel=True)
+        self.create_grid(self.get_current_price(warm.quote), parallel=True)
 
         while True:
             try:
@@ -132,14 +150,21 @@ class SpotGrid:
                 logger.error(f"Unexpected error: {ex}")
                 time.sleep(60)  # Wait a minute before continuing
 
-    def cancel_all_orders(self):
-        open_orders = self.bpx.get_all_open_orders(symbol=self.symbol)
-        for order in open_orders:
-            try:
-                self.bpx.cancel_order(self.symbol, order.get("id"))
-                logger.info(f"Cancelled order: {order.get('id')}")
-            except Exception as e:
-                logger.error(f"Error cancelling order: {e}")
+    def cancel_all_orders(self, open_orders=None, parallel=False):
+        if open_orders is None:
+            open_orders = self.bpx.get_all_open_orders(symbol=self.symbol)
+        if parallel:
+            startup.map(self.cancel_order, open_orders, workers=self.parallel_orders)
+        else:
+            for order in open_orders:
+                self.cancel_order(order)
+
+    def cancel_order(self, order):
+        try:
+            self.bpx.cancel_order(self.symbol, order.id)
+            logger.info(f"Cancelled order: {order.id}")
+        except Exception as e:
+            logger.error(f"Error cancelling order: {e}")
 
 if __name__ == '__main__':
     grid = SpotGrid()
@@ -0,0 +1,22 @@
+import base64
+from unittest import mock
+
+import pytest
+
+from bpx.bpx import BpxClient
+
+SECRET = base64.b64encode(bytes(range(32))).decode()  # 固定私钥，Ed25519 签名结果可重复
+
+
+@pytest.fixture
+def client():
+    client = BpxClient()
+    client.init('api_key', SECRET)
+    return client
+
+
+# 当前线程的会话替换为 Mock，client.session 即该 Mock
+@pytest.fixture
+def session_client(client):
+    with mock.patch('bpx.bpx.get_session', return_value=mock.Mock()):
+        yield client
@@ -0,0 +1,82 @@
+import threading
+from unittest import mock
+
+import pytest
+
+from bpx.bpx import BpxClient
+from bpx.bpx_pub import get_session
+
+
+class Response:
+    def __init__(self, status_code, text):
+        self.status_code = status_code
+        self.text = text
+        self.content = text.encode()
+
+
+def test_each_thread_gets_its_own_session():
+    sessions = {}
+
+    def record(name):
+        sessions[name] = (get_session(), get_session(), BpxClient().session)
+
+    threads = [threading.Thread(target=record, args=(i,)) for i in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    for first, second, client_session in sessions.values():
+        assert first is second is client_session
+    assert len({id(s[0]) for s in sessions.values()}) == 3
+
+
+def test_exe_order_retries_immediately_when_resync_moves_offset(session_client):
+    session_client.session.post.side_effect = [
+        Response(400, 'Request has expired'),
+        Response(200, '{"id": "1", "price": "150.5", "quantity": "0.2", "side": "Bid"}'),
+    ]
+    session_client.clock = mock.Mock(now_ms=mock.Mock(return_value=1710000000000), window=mock.Mock(return_value=5000))
+    session_client.clock.sync.return_value = True
+
+    with mock.patch('time.sleep') as sleep:
+        order = session_client.exe_order(1123456, 'SOL_USDC', 'Bid', 'Limit', 'GTC', 0.2, 150.5)
+
+    session_client.clock.sync.assert_called_once_with(reset=True)
+    sleep.assert_not_called()
+    assert order.price == 150.5
+
+
+def test_exe_order_backs_off_when_resync_does_not_move_offset(session_client):
+    session_client.session.post.side_effect = [Response(400, 'Request has expired')] * 6
+    session_client.clock = mock.Mock(now_ms=mock.Mock(return_value=1710000000000), window=mock.Mock(return_value=5000))
+    session_client.clock.sync.return_value = False
+
+    with mock.patch('time.sleep') as sleep:
+        assert session_client.exe_order(1123456, 'SOL_USDC', 'Bid', 'Limit', 'GTC', 0.2, 150.5) is None
+
+    assert sleep.call_args_list == [mock.call(1)] * 5
+
+
+@pytest.mark.parametrize('method', ['get_all_open_orders', 'get_history_orders'])
+def test_order_lists_return_empty_on_api_error(session_client, method):
+    session_client.session.get.return_value = Response(400, '{"code": "INVALID_CLIENT_REQUEST", "message": "bad"}')
+    assert getattr(session_client, method)('SOL_USDC') == []
+
+
+def test_get_all_open_orders_decodes_records(session_client):
+    session_client.session.get.return_value = Response(200, '[{"id": "1", "clientId": 1123456, "price": "150.5", "side": "Ask"}]')
+    orders = session_client.get_all_open_orders('SOL_USDC')
+    assert [(o.id, o.price, o.side) for o in orders] == [('1', 150.5, 'Ask')]
+
+
+def test_exe_order_accepted_returns_numeric_record(session_client):
+    session_client.session.post.return_value = Response(202, '{"id": "7"}')
+    order = session_client.exe_order(1123456, 'SOL_USDC', 'Ask', 'Limit', 'GTC', '0.2', '150.5')
+    assert (order.id, order.client_id, order.price, order.quantity, order.status) == ('7', 1123456, 150.5, 0.2, 'New')
+
+
+def test_exe_order_bad_price_raises_before_submitting(session_client):
+    with pytest.raises(ValueError):
+        session_client.exe_order(1123456, 'SOL_USDC', 'Ask', 'Limit', 'GTC', 0.2, 'not a price')
+    session_client.session.post.assert_not_called()
@@ -0,0 +1,126 @@
+import threading
+import time
+from unittest import mock
+
+from bpx.clock import ClockSync
+
+
+def sync_with(clock, samples, now, mono=None, **kwargs):
+    with mock.patch.object(clock, 'sample', side_effect=samples), mock.patch('time.time', return_value=now), \
+            mock.patch('time.monotonic', return_value=now if mono is None else mono):
+        return clock.sync(**kwargs)
+
+
+def test_forced_resync_replaces_low_rtt_samples_after_clock_jump():
+    clock = ClockSync()
+    sync_with(clock, [(0., 20.)] * 4, now=1000.)
+    assert clock.offset == 0.
+
+    sync_with(clock, [(5000., 60.)] * 4, now=1001., reset=True)
+    assert clock.offset == 5000.
+    assert clock.error == 30.
+
+
+def test_samples_older_than_interval_are_dropped():
+    clock = ClockSync(interval=30)
+    sync_with(clock, [(0., 20.)] * 4, now=1000.)
+
+    sync_with(clock, [(5000., 60.)] * 4, now=1031.)
+    assert clock.offset == 5000.
+    assert len(clock.samples) == 4
+
+
+def test_samples_expire_after_backward_wall_clock_jump():
+    clock = ClockSync(interval=30)
+    sync_with(clock, [(0., 20.)] * 4, now=10000., mono=100.)
+    assert clock.offset == 0.
+
+    # 本地时钟回拨 1 小时：旧样本的 wall-clock 采样时间落在"未来"，但 monotonic 年龄照常增长
+    jumped = [(3600000., 60.)] * 4
+    sync_with(clock, jumped, now=10000. - 3600 + 31, mono=131.)
+    assert clock.offset == 3600000.
+
+
+def test_recent_low_rtt_samples_still_win():
+    clock = ClockSync(interval=30)
+    sync_with(clock, [(0., 20.)] * 4, now=1000.)
+
+    sync_with(clock, [(40., 60.)] * 4, now=1010.)
+    assert clock.offset == 0.
+
+
+def test_failed_resync_keeps_previous_offset():
+    clock = ClockSync()
+    sync_with(clock, [(250., 20.)] * 4, now=1000.)
+
+    sync_with(clock, [OSError('timeout')] * 4, now=1001., reset=True)
+    assert clock.offset == 250.
+
+
+def test_window_never_below_configured_minimum():
+    clock = ClockSync()
+    assert clock.window(5000) == 5000
+    sync_with(clock, [(0., 2000.)] * 4, now=1000.)
+    assert clock.window(5000) == 4 * 2000 + 1000
+    sync_with(clock, [(0., 30000.)] * 4, now=1001.)
+    assert clock.window(5000) == 60000
+
+
+def test_sync_reports_whether_offset_changed():
+    clock = ClockSync()
+    sync_with(clock, [(0., 20.)] * 4, now=1000.)
+
+    assert sync_with(clock, [(5., 20.)] * 4, now=1001., reset=True) is False
+    assert sync_with(clock, [(5000., 20.)] * 4, now=1002., reset=True) is True
+    assert sync_with(clock, [OSError('timeout')] * 4, now=1003., reset=True) is False
+
+
+def test_window_uses_rtt_history_beyond_latest_burst():
+    clock = ClockSync(interval=30, samples=16)
+    sync_with(clock, [(0., 2000.)] * 4, now=1000.)
+    for now in (1031., 1062., 1093.):
+        sync_with(clock, [(0., 20.)] * 4, now=now)
+
+    # 偏移只看最新一轮样本，窗口仍覆盖历史中的慢请求
+    assert len(clock.samples) == 4 and clock.error == 10.
+    assert clock.window(5000) == 4 * 2000 + 10
+
+    sync_with(clock, [(0., 20.)] * 4, now=1124., reset=True)
+    assert clock.window(5000) == 5000
+    assert len(clock.rtts) == 16
+
+
+def test_forced_resync_is_debounced():
+    clock = ClockSync(debounce=1)
+    assert sync_with(clock, [(5000., 20.)] * 4, now=1000., reset=True) is True
+
+    # 0.5 秒内再次强制同步：不发请求、不清空样本，直接复用上次结果
+    sample = mock.Mock()
+    with mock.patch.object(clock, 'sample', sample), mock.patch('time.monotonic', return_value=1000.5):
+        assert clock.sync(reset=True) is True
+    sample.assert_not_called()
+    assert len(clock.samples) == 4
+
+    assert sync_with(clock, [(5000., 20.)] * 4, now=1002., reset=True) is False
+
+
+def test_concurrent_forced_resyncs_sample_once():
+    clock = ClockSync(debounce=1)
+    calls = []
+
+    def sample():
+        calls.append(1)
+        time.sleep(0.01)
+        return 5000., 20.
+
+    results = []
+    with mock.patch.object(clock, 'sample', side_effect=sample):
+        threads = [threading.Thread(target=lambda: results.append(clock.sync(reset=True))) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+    assert len(calls) == clock.burst
+    assert results == [True] * 8
+    assert clock.offset == 5000.
@@ -0,0 +1,120 @@
+import base64
+import json
+import sys
+from unittest import mock
+from urllib.parse import urlencode
+
+import pytest
+
+import bpx
+from bpx import codec
+
+NOW = 1710000000.123
+
+CASES = [
+    ('balanceQuery', None),
+    ('balanceQuery', {}),
+    ('depositQueryAll', {}),
+    ('depositAddressQuery', {'blockchain': 'Solana'}),
+    ('withdrawalQueryAll', {'limit': 100, 'offset': 0}),
+    ('fillHistoryQueryAll', {'symbol': None}),
+    ('orderQuery', {'symbol': 'SOL_USDC', 'orderId': '111947204356'}),
+    ('orderQueryAll', {}),
+    ('orderExecute', {'clientId': 1234567, 'symbol': 'SOL_USDC', 'side': 'Bid', 'orderType': 'Limit',
+                      'timeInForce': 'GTC', 'quantity': 0.2, 'price': 151.37}),
+    ('orderCancelAll', {'symbol': 'SOL_USDC'}),
+    ('weird instruction&=', {'z': 'a b&c=d', 'a': '中文/+?', 'm': True}),
+]
+
+
+# BpxClient.sign 优化前的实现，作为逐字节对比的基准
+def baseline_sign(client, instruction, params=None):
+    timestamp = str(int(NOW * 1000))
+    window = '5000'
+
+    body = {
+        'instruction': instruction,
+        **dict(sorted((params or {}).items())),
+        'timestamp': timestamp,
+        'window': window,
+    }
+    message = urlencode(body)
+    signature = client.private_key.sign(message.encode())
+    signature_b64 = base64.b64encode(signature).decode()
+
+    return {
+        'X-API-KEY': client.verifying_key_b64,
+        'X-TIMESTAMP': timestamp,
+        'X-WINDOW': window,
+        'Content-Type': 'application/json',
+        'X-SIGNATURE': signature_b64
+    }
+
+
+@pytest.mark.parametrize('instruction, params', CASES)
+def test_sign_matches_baseline_byte_for_byte(client, instruction, params):
+    with mock.patch('time.time', return_value=NOW):
+        headers = client.sign(instruction, params)
+    expected = baseline_sign(client, instruction, params)
+    assert list(headers.items()) == list(expected.items())
+
+
+def test_sign_does_not_mutate_header_template(client):
+    with mock.patch('time.time', return_value=NOW):
+        headers = client.sign('balanceQuery')
+    headers['X-API-KEY'] = 'other'
+    assert client.headers['X-API-KEY'] == client.verifying_key_b64
+    assert client.headers['X-SIGNATURE'] == ''
+
+
+@pytest.mark.parametrize('instruction, params', CASES)
+def test_signing_message_matches_urlencode(instruction, params):
+    body = {'instruction': instruction, **dict(sorted((params or {}).items())), 'timestamp': '1', 'window': '5000'}
+    assert codec.signing_message(instruction, params, '1', '5000') == urlencode(body).encode()
+
+
+def test_stdlib_json_fallback(monkeypatch):
+    # 重新导入会同时改写 sys.modules 和 bpx 包上的 codec 属性，两者都交给 monkeypatch 还原
+    monkeypatch.setitem(sys.modules, 'orjson', None)
+    monkeypatch.delitem(sys.modules, 'bpx.codec')
+    monkeypatch.setattr(bpx, 'codec', codec)
+    import bpx.codec as fallback
+
+    assert fallback is not codec and fallback.orjson is None
+    assert fallback.dumps({'price': 151.37, 'clientId': 1123456}) == b'{"price":151.37,"clientId":1123456}'
+    assert fallback.loads(b'{"price": 151.37}') == {'price': 151.37}
+
+
+def test_stdlib_json_fallback_restores_original_module():
+    assert bpx.codec is codec
+    assert sys.modules['bpx.codec'] is codec
+
+
+def test_dumps_round_trips_order_params():
+    params = {'clientId': 1123456, 'symbol': 'SOL_USDC', 'quantity': 0.2, 'price': 151.37}
+    assert json.loads(codec.dumps(params)) == params
+
+
+def test_decode_order_converts_numeric_fields():
+    order = codec.decode_order({'id': '1', 'clientId': 1123456, 'price': '151.37', 'quantity': '0.2',
+                                'executedQuantity': '0', 'triggerPrice': None, 'side': 'Bid'})
+    assert order.price == 151.37 and order.quantity == 0.2 and order.executed_quantity == 0.
+    assert order['clientId'] == 1123456 and order.get('side') == 'Bid'
+    assert order.get('triggerPrice') is None and order.get('unknown', 'x') == 'x'
+
+
+def test_decode_depth_converts_levels():
+    depth = codec.decode_depth({'asks': [['151.40', '3.1']], 'bids': [['151.30', '1.5']], 'lastUpdateId': '1'})
+    assert depth.bids == [(151.30, 1.5)] and depth['asks'][0] == (151.40, 3.1)
+    assert depth['lastUpdateId'] == '1'
+
+
+def test_order_rejects_unknown_fields():
+    with pytest.raises(TypeError):
+        codec.Order(id='1', pirce=151.37)
+    order = codec.Order(id='1', price=151.37)
+    assert order.price == 151.37 and order.quantity is None
+
+
+def test_to_float_keeps_none():
+    assert codec.to_float('151.37') == 151.37 and codec.to_float(0.2) == 0.2 and codec.to_float(None) is None
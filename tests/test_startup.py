@@ -0,0 +1,143 @@
+import io
+import threading
+import time
+from unittest import mock
+
+from bpx import startup as startup_module
+from bpx.startup import Startup
+
+
+def test_map_bounds_concurrency_and_keeps_order():
+    startup = Startup(workers=8)
+    lock = threading.Lock()
+    running = []
+    peak = []
+
+    def task(i):
+        with lock:
+            running.append(i)
+            peak.append(len(running))
+        time.sleep(0.01)
+        with lock:
+            running.remove(i)
+        return i * 2
+
+    assert startup.map(task, range(10), workers=3) == [i * 2 for i in range(10)]
+    assert max(peak) <= 3
+
+
+def test_map_does_not_wait_for_slowest_task_in_window():
+    startup = Startup(workers=8)
+    finished = []
+
+    def task(i):
+        time.sleep(0.2 if i == 0 else 0.01)
+        finished.append(i)
+        return i
+
+    assert startup.map(task, range(6), workers=2) == list(range(6))
+    # 第 0 个任务很慢，其余任务通过另一个空位依次完成
+    assert finished == [1, 2, 3, 4, 5, 0]
+
+
+def test_map_handles_empty_items():
+    assert Startup().map(lambda x: x, []) == []
+    assert Startup().map(lambda x: x, [], workers=2) == []
+
+
+def fake_open(files):
+    def opener(path, *args, **kwargs):
+        if path not in files:
+            raise FileNotFoundError(path)
+        return io.StringIO(files[path])
+    return opener
+
+
+def test_process_start_parses_proc_stat():
+    # 进程名带空格和括号，starttime 是第 22 个字段
+    stat = '1234 (python (grid) x) S ' + ' '.join(['0'] * 18) + ' 5000 ' + ' '.join(['0'] * 10)
+    files = {'/proc/self/stat': stat, '/proc/uptime': '100.00 50.00\n'}
+    with mock.patch('builtins.open', fake_open(files)), mock.patch('os.sysconf', return_value=100), \
+            mock.patch('time.time', return_value=10000.):
+        assert startup_module._process_start() == 10000. - 100. + 5000 / 100
+
+
+def test_process_start_falls_back_without_proc():
+    with mock.patch('builtins.open', fake_open({})), mock.patch('time.time', return_value=10000.):
+        assert startup_module._process_start() == 10000.
+
+
+def test_warm_up_queries_account_only_after_keys_are_loaded():
+    events = []
+    lock = threading.Lock()
+
+    def record(name, delay=0.):
+        def call(*args, **kwargs):
+            with lock:
+                events.append(('start', name))
+            time.sleep(delay)
+            with lock:
+                events.append(('end', name))
+            return name
+        return call
+
+    client = mock.Mock()
+    client.init.side_effect = record('init', 0.05)
+    client.enable_clock_sync.side_effect = record('clock', 0.02)
+    client.balances.side_effect = record('balances')
+    client.get_all_open_orders.side_effect = record('open_orders')
+    quote = mock.Mock(side_effect=record('quote'))
+
+    markets = record('markets')
+    market_list = [{'symbol': 'BTC_USDC', 'filters': {}},
+                   {'symbol': 'SOL_USDC', 'filters': {'price': {'tickSize': '0.01'}, 'quantity': {'stepSize': '0.001'}}}]
+
+    startup = Startup()
+    with mock.patch.object(startup_module.bpx_pub, 'markets', side_effect=lambda: markets() and market_list):
+        warm = startup.warm_up(client, 'key', 'secret', 'SOL_USDC', quote=quote)
+
+    client.init.assert_called_once_with('key', 'secret')
+    quote.assert_called_once_with('SOL_USDC')
+    client.get_all_open_orders.assert_called_once_with('SOL_USDC')
+    assert (warm.quote, warm.balances, warm.open_orders) == ('quote', 'balances', 'open_orders')
+    assert (warm.price_precision, warm.quantity_precision) == (2, 3)
+
+    init_end = events.index(('end', 'init'))
+    clock_end = events.index(('end', 'clock'))
+    for name in ('balances', 'open_orders'):
+        assert events.index(('start', name)) > max(init_end, clock_end)
+    # 行情和市场信息不等待密钥加载
+    assert events.index(('start', 'quote')) < init_end
+    assert events.index(('start', 'markets')) < init_end
+    assert list(startup.marks) == ['warm_up', 'keys_loaded', 'warm_up_done']
+
+
+def test_first_order_is_recorded_once():
+    startup = Startup()
+    startup.started_at = 1000.
+    with mock.patch('time.time', return_value=1000.25):
+        startup.order_acknowledged()
+    with mock.patch('time.time', return_value=1005.):
+        startup.map(lambda _: startup.order_acknowledged(), range(8))
+
+    assert startup.first_order_at == 1000.25
+    assert startup.marks['first_order'] == 250
+
+
+def test_markets_fetched_once_per_process_and_retried_after_failure():
+    client = mock.Mock()
+    startup = Startup()
+    markets = mock.Mock(side_effect=[OSError('down'), [{'symbol': 'SOL_USDC', 'filters': {'price': {'tickSize': '0.1'}}}]])
+    with mock.patch.object(startup_module.bpx_pub, 'markets', markets):
+        first = startup.warm_up(client, 'key', 'secret', 'SOL_USDC', quote=mock.Mock())
+        second = startup.warm_up(client, 'key', 'secret', 'SOL_USDC', quote=mock.Mock())
+        third = startup.warm_up(client, 'key', 'secret', 'SOL_USDC', quote=mock.Mock())
+
+    assert first.price_precision is None
+    assert second.price_precision == third.price_precision == 1
+    assert second.quantity_precision is None
+    assert markets.call_count == 2
+
+
+def test_decimals_from_step_size():
+    assert [startup_module._decimals(s) for s in ('0.01', '0.001', '1', '0.5', '10', None)] == [2, 3, 0, 1, 0, None]